@@ -1,6 +1,7 @@
 import collections
 import os
 import platform
+import stat
 from time import time
 import traceback
 
@@ -18,6 +19,8 @@ CONTEXT_ACTION_FILE_GOTO = 'Goto'
 CONTEXT_ACTION_FILE_NEW = 'New File'
 CONTEXT_ACTION_FOLDER_NEW = 'Create Folder'
 
+DIGITS = frozenset('0123456789')
+
 if platform.system() == 'Windows':
     def is_path_root(s):
         # type: (str) -> bool
@@ -166,6 +169,43 @@ def find_all(pat, s):
 access = os.access
 is_file = os.path.isfile
 
+
+# Directory listings from recent right-clicks, keyed by the directory path
+# and its modification time, so that a changed directory is listed again.
+LISTDIR_CACHE_SIZE = 64
+listdir_cache = collections.OrderedDict()  # type: collections.OrderedDict[tuple[str, int], list[str]]
+# Some filesystems only update a directory's modification time every 1-2
+# seconds. A file created in the same tick as a listing leaves the time
+# unchanged, so a listing of a recently modified directory is not cached.
+LISTDIR_RACY_SECONDS = 2
+
+
+def listdir(path):
+    # type: (str) -> list[str]
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns)
+    names = listdir_cache.get(key)
+    if names is None:
+        names = os.listdir(path)
+        if time() - st.st_mtime >= LISTDIR_RACY_SECONDS:
+            listdir_cache[key] = names
+            if len(listdir_cache) > LISTDIR_CACHE_SIZE:
+                listdir_cache.popitem(last=False)
+    else:
+        listdir_cache.move_to_end(key)
+    return names
+
+
+def file_mode(path):
+    # type: (str) -> int
+    # Return the `st_mode` of `path`, or 0 if it does not exist. This allows
+    # one `stat` call to answer both "is it a file?" and "is it a folder?".
+    try:
+        return os.stat(path).st_mode
+    except (OSError, ValueError):
+        return 0
+
+
 if access in os.supports_effective_ids:
     def is_readable(path):
         return access(path, os.R_OK, effective_ids=True)
@@ -208,16 +248,21 @@ class TextFound(Candidate):
 
 def candidates_from_string(text, folder_iterate, region=sublime.Region(0, 0)):
     # (str, Callable[[], Iterator[str]], sublime.Region) -> Iterator[Candidate]
-    path = expanduser(text)
+    if text[:1] == '~':
+        path = expanduser(text)
+    else:
+        # Only tilde paths are changed by `expanduser`
+        path = text
     expanded = expanduser(os.path.expandvars(text))
     if path != expanded:
         if os.path.isabs(path):
-            if is_file(path):
+            mode = file_mode(path)
+            if stat.S_ISREG(mode):
                 if is_readable(path):
                     yield FileFound(region, path)
                 else:
                     print('GidOpen: - skip {}: not readable'.format(path))
-            elif os.path.isdir(path):
+            elif stat.S_ISDIR(mode):
                 yield FolderFound(region, path)
             elif os.path.isdir(os.path.dirname(path)):
                 yield FileNotFound(region, path)
@@ -241,12 +286,13 @@ def candidates_from_string(text, folder_iterate, region=sublime.Region(0, 0)):
                     yield FolderFound(region, path)
 
     if os.path.isabs(expanded):
-        if is_file(expanded):
+        mode = file_mode(expanded)
+        if stat.S_ISREG(mode):
             if is_readable(expanded):
                 yield FileFound(region, expanded)
             else:
                 print('GidOpen: - skip {}: not readable'.format(expanded))
-        elif os.path.isdir(expanded):
+        elif stat.S_ISDIR(mode):
             yield FolderFound(region, expanded)
         elif os.path.isdir(os.path.dirname(expanded)):
             yield FileNotFound(region, expanded)
@@ -261,12 +307,13 @@ def candidates_from_string(text, folder_iterate, region=sublime.Region(0, 0)):
         for folder in folder_iterate():
             folder = str(folder)
             abspath = os.path.normpath(os.path.join(folder, expanded))
-            if is_file(abspath):
+            mode = file_mode(abspath)
+            if stat.S_ISREG(mode):
                 if is_readable(abspath):
                     yield FileFound(region, abspath)
                 else:
                     print('GidOpen: - skip {}: not readable'.format(abspath))
-            elif os.path.isdir(abspath):
+            elif stat.S_ISDIR(mode):
                 yield FolderFound(region, abspath)
 
 
@@ -342,63 +389,73 @@ def expand_path(view, begin, end):
     return begin, end
 
 
+# Characters after a filename to search for a line and column
+LINE_COL_PEEK = 64
+
+
 def get_line_col(view, pos):
     # type: (sublime.View, int) -> tuple[int, int]|None
     # Parse the characters following the filename to see if they match a
     # number of patterns associated with specific line and column numbers.
-    ch = view.substr(pos)
+    # Fetch the start of the rest of the line once, bounded so a very long
+    # line is not copied. The appended newline ends each scan without
+    # needing to check for the end of the text.
+    end = min(view.line(pos).end(), pos + LINE_COL_PEEK)
+    tail = view.substr(sublime.Region(pos, end)) + '\n'
+    pos = 0
+    ch = tail[pos]
     if ch == ':':
         pos += 1
-        ch = view.substr(pos)
+        ch = tail[pos]
         if ch == ' ':
             pos += 1
-            ch = view.substr(pos)
+            ch = tail[pos]
             if ch == 'l':
-                if view.substr(sublime.Region(pos + 1, pos + 5)) == 'ine ':
+                if tail[pos + 1:pos + 5] == 'ine ':
                     # PATH: line LINE (bash)
                     pos += 5
-                    line = view.substr(pos)
-                    if line not in '0123456789':
+                    line = tail[pos]
+                    if line not in DIGITS:
                         return None
                     pos += 1
-                    ch = view.substr(pos)
-                    while ch in '0123456789':
+                    ch = tail[pos]
+                    while ch in DIGITS:
                         line += ch
                         pos += 1
-                        ch = view.substr(pos)
+                        ch = tail[pos]
                     return (line, 0)
-            elif ch in '0123456789':
+            elif ch in DIGITS:
                 # PATH: LINE: (bash)
                 line = ch
                 pos += 1
-                ch = view.substr(pos)
-                while ch in '0123456789':
+                ch = tail[pos]
+                while ch in DIGITS:
                     line += ch
                     pos += 1
-                    ch = view.substr(pos)
+                    ch = tail[pos]
                 if ch == ':':
                     return (line, 0)
-        elif ch in '0123456789':
+        elif ch in DIGITS:
             # PATH:LINE[:COL]
             line = ch
             pos += 1
-            ch = view.substr(pos)
-            while ch in '0123456789':
+            ch = tail[pos]
+            while ch in DIGITS:
                 line += ch
                 pos += 1
-                ch = view.substr(pos)
+                ch = tail[pos]
             if ch != ':':
                 return (line, 0)
             pos += 1
-            col = view.substr(pos)
-            if col not in '0123456789':
+            col = tail[pos]
+            if col not in DIGITS:
                 return (line, 0)
             pos += 1
-            ch = view.substr(pos)
-            while ch in '0123456789':
+            ch = tail[pos]
+            while ch in DIGITS:
                 col += ch
                 pos += 1
-                ch = view.substr(pos)
+                ch = tail[pos]
             if ord(ch) <= 32 or ch in ':':
                 return (line, col)
             else:
@@ -406,18 +463,18 @@ def get_line_col(view, pos):
                 return (line, 0)
         return None
     elif ch == '"':
-        if view.substr(sublime.Region(pos + 1, pos + 8)) == ', line ':
+        if tail[pos + 1:pos + 8] == ', line ':
             # "PATH", line LINE (Python)
             pos += 8
-            line = view.substr(pos)
-            if line not in '0123456789':
+            line = tail[pos]
+            if line not in DIGITS:
                 return None
             pos += 1
-            ch = view.substr(pos)
-            while ch in '0123456789':
+            ch = tail[pos]
+            while ch in DIGITS:
                 line += ch
                 pos += 1
-                ch = view.substr(pos)
+                ch = tail[pos]
             return (line, 0)
     return None
 
@@ -434,6 +491,10 @@ class gidopen_in_view(sublime_plugin.TextCommand):
         self._folder_excludes = self.view.settings().get(
             'folder_exclude_patterns'
         )
+        # Visibility for the event of the last description, so that
+        # `is_visible` for the same event does not read the settings back
+        self._event_key = None  # type: tuple[float, float]|None
+        self._visible = False
 
     def _get_home(self):
         # type: () -> AbsolutePath
@@ -560,15 +621,15 @@ class gidopen_in_view(sublime_plugin.TextCommand):
                         print('GidOpen: - skip {}: not readable'.format(self._shorten_name(path)))
 
     def all_files_prefixed_by(self, prefix, prefix_region):
-        # (str, sublime.Region) -> Generator[Candidate, None, bool]
-        # yield all filesystem paths that start with the
+        # (str, sublime.Region) -> list[Candidate]
+        # return all filesystem paths that start with the
         # path `prefix`. The prefix ends at `prefix_region.end()`.
-        found = False
+        candidates = []  # type: list[Candidate]
         # split into dirname and basename prefix
         d, p = os.path.split(prefix)
         if os.path.isdir(d):
             name_prefix = os.path.normcase(p)
-            for name in os.listdir(d):
+            for name in listdir(d):
                 if os.path.normcase(name).startswith(name_prefix):
                     path = os.path.join(d, name)
                     suffix = PartialPath(path[len(prefix):])
@@ -578,24 +639,21 @@ class gidopen_in_view(sublime_plugin.TextCommand):
                             if name in self._folder_excludes:
                                 print('GidOpen: - skip {}: excluded folder'.format(self._shorten_name(path)))
                             else:
-                                found = True
-                                yield FolderFound(region, path)
+                                candidates.append(FolderFound(region, path))
                                 if is_path_sep(self.view.substr(region.end())):
-                                    yield from self.all_matching_descendants(path, region)
+                                    candidates.extend(self.all_matching_descendants(path, region))
                         else:
                             if is_readable(path):
-                                found = True
-                                yield FileFound(region, path)
+                                candidates.append(FileFound(region, path))
                             else:
                                 print('GidOpen: - skip {}: not readable'.format(self._shorten_name(path)))
-        return found
+        return candidates
 
     def check_absolute_path(self, region, path):
-        # (sublime.Region, str) -> Generator[Candidate, None, bool]
-        found = False
+        # (sublime.Region, str) -> list[Candidate]
         if os.path.isabs(path):
             print('GidOpen: - absolute')
-            found = yield from self.all_files_prefixed_by(os.path.normpath(path), region)
+            return self.all_files_prefixed_by(os.path.normpath(path), region)
         elif path[0] == '~':
             # Looks like a tilde expanded absolute path.
             print('GidOpen: - absolute')
@@ -604,10 +662,10 @@ class gidopen_in_view(sublime_plugin.TextCommand):
                 # If path starts with '~alice' but user `alice` does not exist,
                 # then `expanduser` keeps the path as '~alice', in which case
                 # don't treat it as an absolute path.
-                found = yield from self.all_files_prefixed_by(
+                return self.all_files_prefixed_by(
                     os.path.normpath(expanded), region
                 )
-        return found
+        return []
 
     def _handle_click_region(self, region):
         # (Region) -> Iterator[Candidate]
@@ -651,19 +709,22 @@ class gidopen_in_view(sublime_plugin.TextCommand):
         if platform.system() == 'Windows' and begin >= 2 and self.view.substr(begin - 1) == ':':
             driveregion = sublime.Region(begin - 2, region.end())
             drivepath = self.view.substr(driveregion)
-            found = yield from self.check_absolute_path(driveregion, drivepath)
-            if found:
+            candidates = self.check_absolute_path(driveregion, drivepath)
+            if candidates:
+                yield from candidates
                 return
 
-        found = yield from self.check_absolute_path(region, path)
-        if found:
+        candidates = self.check_absolute_path(region, path)
+        if candidates:
+            yield from candidates
             return
 
         expanded = os.path.expandvars(path)
         if expanded != path:
             # e.g. ${HOME}/file
-            found = yield from self.check_absolute_path(region, expanded)
-            if found:
+            candidates = self.check_absolute_path(region, expanded)
+            if candidates:
+                yield from candidates
                 return
 
         if basename == path:
@@ -744,22 +805,27 @@ class gidopen_in_view(sublime_plugin.TextCommand):
         for folder in self._folder_iterate():
             folder = str(folder)
             print('GidOpen: - in', self._shorten_name(folder))
-            for name in os.listdir(folder):
+            for name in listdir(folder):
+                name_normcase = os.path.normcase(name)
+                if basename_normcase not in name_normcase:
+                    # most names do not match, so skip them cheaply
+                    continue
                 fullpath = os.path.join(folder, name)
-                for idx in find_all(basename_normcase, os.path.normcase(name)):
+                for idx in find_all(basename_normcase, name_normcase):
                     # matched name starts `idx` chars before basename
                     text_start = begin - idx
                     text_end = text_start + len(name)
                     text_region = sublime.Region(text_start, text_end)
                     text = self.view.substr(text_region)
                     if PartialPath(text) == PartialPath(name):
-                        if os.path.isdir(fullpath):
+                        mode = file_mode(fullpath)
+                        if stat.S_ISDIR(mode):
                             yield FolderFound(text_region, fullpath)
                             if is_path_sep(self.view.substr(text_end)):
                                 yield from self.all_matching_descendants(
                                     fullpath, text_region
                                 )
-                        elif is_file(fullpath):
+                        elif stat.S_ISREG(mode):
                             if is_readable(fullpath):
                                 yield FileFound(text_region, fullpath)
                             else:
@@ -775,7 +841,7 @@ class gidopen_in_view(sublime_plugin.TextCommand):
             print('GidOpen: - in', self._shorten_name(folder))
             if os.path.isdir(folder):
                 prefix = os.path.join(folder, basename)
-                for name in os.listdir(folder):
+                for name in listdir(folder):
                     if os.path.normcase(name).startswith(basename_normcase):
                         path = os.path.join(folder, name)
                         suffix = PartialPath(path[len(prefix):])
@@ -799,7 +865,11 @@ class gidopen_in_view(sublime_plugin.TextCommand):
             if folder <= home:
                 # too big to search recursively
                 continue
-            folder = str(folder)
+            # Only a folder containing pwd can reach pwd while walking
+            pwd_in_folder = folder < pwd
+            # Walk the normalized folder, so that the paths it produces are
+            # already normalized and can be compared without AbsolutePath.
+            folder = folder.norm
 
             print('GidOpen: - under', self._shorten_name(folder))
             for dirpath, dirnames, filenames in os.walk(folder):
@@ -811,7 +881,7 @@ class gidopen_in_view(sublime_plugin.TextCommand):
                 while i < len(dirnames):
                     dirname = dirnames[i]
                     path = os.path.join(dirpath, dirname)
-                    if AbsolutePath(path) == pwd:
+                    if pwd_in_folder and os.path.normcase(path) == pwd.canonical:
                         # already searched in pwd, but still need to
                         # search below pwd, so keep in dirnames
                         i += 1
@@ -857,91 +927,126 @@ class gidopen_in_view(sublime_plugin.TextCommand):
         return True
 
     def description(self, event):
+        # Record the event only once the setting is written, so a failure
+        # cannot leave `is_visible` answering from an earlier click.
+        self._event_key = None
         try:
-            self._pwd = None
-
-            click_point = self.view.window_to_text((event['x'], event['y']))
-
-            for selected_region in self.view.sel():
-                if (
-                    selected_region.contains(click_point)
-                    and not selected_region.empty()
-                ):
-                    candidates = self._handle_click_region(selected_region)
-                    break
+            event_key = (event['x'], event['y'])
+            click_point = self.view.window_to_text(event_key)
+        except Exception as e:
+            return self._report_error(e)
+        message, action, path = self._describe(click_point)
+        self._event_key = event_key
+        self._visible = action is not None
+        return message
+
+    def _report_error(self, e):
+        # type: (Exception) -> str
+        # Store the error action, so the menu shows the error disabled
+        traceback.print_exc()
+        self.view.settings().set('gidopen_in_view', (CONTEXT_ACTION_ERROR, None))
+        return 'GidOpen: {}'.format(e.__class__.__name__)
+
+    def _describe(self, click_point):
+        # type: (int) -> tuple[str, str|None, str|None]
+        # The menu description for a right-click at text point `click_point`,
+        # with the action and path stored in the view settings. Tests call
+        # this directly to avoid converting to window coordinates and
+        # reading the settings back.
+        try:
+            action, path, name, linecol = self._resolve(click_point)
+            if name is None:
+                label = None
             else:
-                candidates = self._handle_click_point(click_point)
-
-            files = []
-            folders = []
-            notfiles = []
-            notfolders = []
-            texts = []
-
-            for candidate in candidates:
-                print('GidOpen:', candidate)
-                if isinstance(candidate, FileFound):
-                    files.append(candidate)
-                elif isinstance(candidate, FolderFound):
-                    folders.append(candidate)
-                elif isinstance(candidate, FileNotFound):
-                    notfiles.append(candidate)
-                elif isinstance(candidate, FolderNotFound):
-                    notfolders.append(candidate)
-                else:
-                    assert isinstance(candidate, TextFound)
-                    texts.append(candidate)
-
-            candidate = self._best(files)
-            if candidate is not None:
-                path = candidate.path
-                label = self._shorten_name(path)
-                linecol = get_line_col(self.view, candidate.region.end())
+                label = self._shorten_name(name)
                 if linecol:
                     line, col = linecol
-                    path = '{}:{}:{}'.format(path, line, col)
                     if col == 0:
                         label = '{}:{}'.format(label, line)
                     else:
                         label = '{}:{}:{}'.format(label, line, col)
-                    action = CONTEXT_ACTION_FILE_GOTO
+            return '{} {}'.format(action, label), action, path
+        except Exception as e:
+            return self._report_error(e), CONTEXT_ACTION_ERROR, None
+
+    def _resolve(self, click_point):
+        # type: (int) -> tuple[str|None, str|None, str|None, tuple[str, str|int]|None]
+        # Find the action and path for a right-click at `click_point` and
+        # store them in the view settings, without formatting a menu label.
+        # Also return the name, which is the path without any line and
+        # column, and the line and column from `get_line_col`.
+        self._pwd = None
+
+        for selected_region in self.view.sel():
+            if (
+                selected_region.contains(click_point)
+                and not selected_region.empty()
+            ):
+                candidates = self._handle_click_region(selected_region)
+                break
+        else:
+            candidates = self._handle_click_point(click_point)
+
+        files = []
+        folders = []
+        notfiles = []
+        notfolders = []
+        texts = []
+
+        for candidate in candidates:
+            print('GidOpen:', candidate)
+            if isinstance(candidate, FileFound):
+                files.append(candidate)
+            elif isinstance(candidate, FolderFound):
+                folders.append(candidate)
+            elif isinstance(candidate, FileNotFound):
+                notfiles.append(candidate)
+            elif isinstance(candidate, FolderNotFound):
+                notfolders.append(candidate)
+            else:
+                assert isinstance(candidate, TextFound)
+                texts.append(candidate)
+
+        linecol = None
+        candidate = self._best(files)
+        if candidate is not None:
+            path = candidate.path
+            linecol = get_line_col(self.view, candidate.region.end())
+            if linecol:
+                path = '{}:{}:{}'.format(path, *linecol)
+                action = CONTEXT_ACTION_FILE_GOTO
+            else:
+                action = CONTEXT_ACTION_FILE_OPEN
+        else:
+            candidate = self._best(folders)
+            if candidate is not None:
+                path = candidate.path
+                if self._folder_in_project(path):
+                    action = CONTEXT_ACTION_FOLDER_REVEAL
                 else:
-                    action = CONTEXT_ACTION_FILE_OPEN
+                    action = CONTEXT_ACTION_FOLDER_ADD
             else:
-                candidate = self._best(folders)
+                candidate = self._best(notfiles)
                 if candidate is not None:
+                    action = CONTEXT_ACTION_FILE_NEW
                     path = candidate.path
-                    if self._folder_in_project(path):
-                        action = CONTEXT_ACTION_FOLDER_REVEAL
-                        label = self._shorten_name(path)
-                    else:
-                        action = CONTEXT_ACTION_FOLDER_ADD
-                        label = self._shorten_name(path)
                 else:
-                    candidate = self._best(notfiles)
+                    candidate = self._best(notfolders)
                     if candidate is not None:
-                        action = CONTEXT_ACTION_FILE_NEW
+                        action = CONTEXT_ACTION_FOLDER_NEW
                         path = candidate.path
-                        label = self._shorten_name(path)
                     else:
-                        candidate = self._best(notfolders)
-                        if candidate is not None:
-                            action = CONTEXT_ACTION_FOLDER_NEW
-                            path = candidate.path
-                            label = self._shorten_name(path)
-                        else:
-                            action = None
-                            path = None
-                            label = None
+                        action = None
+                        path = None
 
-            self.view.settings().set('gidopen_in_view', (action, path))
-            return '{} {}'.format(action, label)
-        except Exception as e:
-            traceback.print_exc()
-            self.view.settings().set('gidopen_in_view', (CONTEXT_ACTION_ERROR, None))
-            return 'GidOpen: {}'.format(e.__class__.__name__)
+        self.view.settings().set('gidopen_in_view', (action, path))
+        if candidate is None:
+            return action, path, None, linecol
+        return action, path, candidate.path, linecol
 
     def is_visible(self, event):
+        if (event['x'], event['y']) == self._event_key:
+            return self._visible
         context = self.view.settings().get('gidopen_in_view')
         return context is not None and context[0] is not None
 
@@ -971,6 +1076,7 @@ class gidopen_in_view(sublime_plugin.TextCommand):
             view = window.open_file(path, options)
             window.focus_view(view)
         self.view.settings().set('gidopen_in_view', None)
+        self._event_key = None
 
 
 class gidopen_in_window(sublime_plugin.WindowCommand):
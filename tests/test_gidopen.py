@@ -1,6 +1,6 @@
+import functools
 import os
 import platform
-import shutil
 import sys
 import tempfile
 from unittest import TestCase, skipIf
@@ -11,184 +11,285 @@ version = sublime.version()
 
 gidopen = sys.modules["sublime-gidopen.gidopen"]
 
+# make sure we have a window to work with
+sublime.load_settings("Preferences.sublime-settings").set(
+    "close_windows_when_empty", False
+)
 
+IS_WINDOWS = platform.system() == 'Windows'
+
+OPEN = gidopen.CONTEXT_ACTION_FILE_OPEN
+GOTO = gidopen.CONTEXT_ACTION_FILE_GOTO
+
+# Create fixture files in memory-backed storage when it is available
+if os.path.isdir('/dev/shm'):
+    TMP_ROOT = '/dev/shm'  # type: str|None
+else:
+    TMP_ROOT = None
+
+if IS_WINDOWS:
+    HOME = None
+else:
+    HOME = gidopen.get_home()  # type: ignore
+
+
+@functools.lru_cache(maxsize=512)
 def shorten_name(path):
     # type: (str) -> str
-    if platform.system() != 'Windows':
-        home = gidopen.get_home()  # type: ignore
-        if home < gidopen.AbsolutePath(path):  # type: ignore
-            return '~' + path[len(home):]
+    if HOME is not None and HOME < gidopen.AbsolutePath(path):  # type: ignore
+        return '~' + path[len(HOME):]
     return path
 
+
+def close_view(view):
+    # type: (sublime.View) -> None
+    view.set_scratch(True)
+    window = view.window()
+    if window.active_view() != view:
+        window.focus_view(view)
+    window.run_command("close_file")
+
+
+def touch(path):
+    # type: (str) -> None
+    # Create an empty file without the overhead of a Python file object.
+    flags = os.O_CREAT | os.O_WRONLY | getattr(os, 'O_CLOEXEC', 0)
+    os.close(os.open(path, flags, 0o644))
+
+
+def make_fixtures(names):
+    # type: (tuple[str, ...]) -> tuple[str, list[str]]
+    # Create a new temporary directory containing empty files called
+    # `names`. Return the directory and the file paths.
+    tmpdir = tempfile.mkdtemp(dir=TMP_ROOT)
+    paths = [os.path.join(tmpdir, name) for name in names]
+    for path in paths:
+        touch(path)
+    return tmpdir, paths
+
+
+def remove_fixtures(tmpdir):
+    # type: (str) -> None
+    # Remove a directory created by `make_fixtures`. Tests never create
+    # subdirectories, so there is no need to walk a tree like `rmtree`.
+    # Report anything left behind rather than failing the module teardown,
+    # which would hide the test results.
+    try:
+        for name in os.listdir(tmpdir):
+            path = os.path.join(tmpdir, name)
+            try:
+                os.unlink(path)
+            except OSError as e:
+                print('GidOpen tests: cannot remove fixture {}: {}'.format(path, e))
+        os.rmdir(tmpdir)
+    except OSError as e:
+        print('GidOpen tests: cannot remove fixtures {}: {}'.format(tmpdir, e))
+
+
+# No test modifies the fixture files, so all test classes share one set,
+# created once per test run.
+FIXTURES = {}  # type: dict[str, str]
+
+
+def setUpModule():
+    tmpdir, paths = make_fixtures(
+        ('present', 'also present', '~4.txt', 'file & ice.txt')
+    )
+    FIXTURES['tmpdir'] = tmpdir
+    (
+        FIXTURES['file_present'], FIXTURES['also_present'],
+        FIXTURES['tilde_file'], FIXTURES['atypical_file'],
+    ) = paths
+    FIXTURES['file_absent'] = os.path.join(tmpdir, 'absent')
+    FIXTURES['path_row'] = FIXTURES['file_present'] + ':12:0'
+    FIXTURES['path_row_col'] = FIXTURES['file_present'] + ':12:34'
+
+
+def tearDownModule():
+    remove_fixtures(FIXTURES['tmpdir'])
+
+
+def add_fixtures(cls):
+    # type: (type) -> None
+    # Make the shared fixture paths available as class attributes
+    for name, value in FIXTURES.items():
+        setattr(cls, name, value)
+
+
+# Find an existing file in the home directory, for tilde and env tests.
+if hasattr(os, 'scandir'):
+    def find_home_file():
+        # type: () -> tuple[str|None, str|None]
+        # Directory entries usually know their type, avoiding a stat per entry
+        with os.scandir(os.path.expanduser('~')) as entries:
+            for entry in entries:
+                if len(entry.name) > 2 and entry.is_file(follow_symlinks=False):
+                    return entry.name, entry.path
+        return None, None
+else:
+    def find_home_file():
+        # type: () -> tuple[str|None, str|None]
+        home = os.path.expanduser('~')
+        for basename in os.listdir(home):
+            if len(basename) > 2:
+                path = os.path.join(home, basename)
+                if os.path.isfile(path):
+                    return basename, path
+        return None, None
+
+
+# Scan once per test run, rather than in each setUp. CI can name a known
+# file in the home directory to skip the scan.
+HOME_PRESENT = os.environ.get('GIDOPEN_TEST_HOME_FILE')
+if (
+    HOME_PRESENT
+    and os.path.dirname(HOME_PRESENT) == os.path.expanduser('~')
+    and os.path.isfile(HOME_PRESENT)
+):
+    HOME_BASE = os.path.basename(HOME_PRESENT)
+else:
+    HOME_BASE, HOME_PRESENT = find_home_file()
+
+
+def interesting_positions(text, start=0):
+    # type: (str, int) -> list[int]
+    # Clicks inside a run of letters and digits all expand to the same path,
+    # so only test the ends and middle of the text, and each side of any
+    # other character, where the expansion can change.
+    end = len(text)
+    positions = {start, (start + end) // 2, end}
+    for pos, c in enumerate(text):
+        if not c.isalnum():
+            positions.add(pos)
+            positions.add(pos + 1)
+    return sorted(pos for pos in positions if pos >= start)
+
+
 class TestPartialPath(TestCase):
 
-    def test_empty_path(self):
-        p = gidopen.PartialPath('')
-        self.assertEqual(str(p), '')
-        self.assertEqual(len(p), 0)
-        self.assertEqual(p.canonical_len(), 0)
-
-    def test_relative_path(self):
-        s = 'dir/file'
-        p = gidopen.PartialPath(s)
-        self.assertEqual(str(p), s)
-        self.assertEqual(len(p), len(s))
-        self.assertEqual(p.canonical_len(), len(s))
-
-    def test_absolute_path(self):
-        s = '/dir/file'
-        p = gidopen.PartialPath(s)
-        self.assertEqual(str(p), s)
-        self.assertEqual(len(p), len(s))
-        self.assertEqual(p.canonical_len(), len(s))
+    # (path, expected length, expected canonical length)
+    CASES = (
+        ('', 0, 0),
+        ('dir/file', 8, 8),  # relative path
+        ('/dir/file', 9, 9),  # absolute path
+    )
+
+    def test_lengths(self):
+        for s, length, canonical_len in self.CASES:
+            p = gidopen.PartialPath(s)
+            self.assertEqual(str(p), s)
+            self.assertEqual(len(p), length, s)
+            self.assertEqual(p.canonical_len(), canonical_len, s)
 
 class TestExpandPath(TestCase):
 
-    def setUp(self):
-        self.view = sublime.active_window().new_file()
-        # make sure we have a window to work with
-        s = sublime.load_settings("Preferences.sublime-settings")
-        s.set("close_windows_when_empty", False)
+    # (text, expected expansion of any point inside the expansion)
+    CASES = (
+        ('[abc]', (1, 4)),  # identifies path-like text
+        ('abc', (0, 3)),  # expands to view limits
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.view = sublime.active_window().new_file()
+
+    @classmethod
+    def tearDownClass(cls):
+        close_view(cls.view)
+
+    def test_expansion(self):
+        for text, expected in self.CASES:
+            self.view.run_command('select_all')
+            self.view.run_command('right_delete')
+            self.view.run_command('append', {'characters': text, 'force': True})
+            for pos in range(expected[0], expected[1] + 1):
+                self.assertEqual(
+                    gidopen.expand_path(self.view, pos, pos), expected, (text, pos)
+                )
 
-    def tearDown(self):
-        if self.view:
-            self.view.set_scratch(True)
-            self.view.window().focus_view(self.view)
-            self.view.window().run_command("close_file")
-
-    def test_identifies_path_like_text(self):
-        text = '[abc]'
-        self.view.run_command('append', {'characters': text, 'force': True})
-        expected = (1, len(text) - 1)
-        for pos in range(expected[0], expected[1] + 1):
-            self.assertEqual(
-                gidopen.expand_path(self.view, pos, pos), expected
-            )
+class TestPWD(TestCase):
 
-    def test_expands_to_view_limits(self):
-        text = 'abc'
-        self.view.run_command('append', {'characters': text, 'force': True})
-        expected = (0, len(text))
-        for pos in range(expected[0], expected[1] + 1):
-            self.assertEqual(
-                gidopen.expand_path(self.view, pos, pos), expected
-            )
+    @classmethod
+    def setUpClass(cls):
+        # Creating a view is slow, so all tests share one view
+        cls.view = sublime.active_window().new_file()
+        cls.settings = cls.view.settings()
 
-class TestPWD(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        close_view(cls.view)
+
+    def _setup_folders(self, setting):
+        # type: (str) -> tuple[gidopen.AbsolutePath, list[gidopen.AbsolutePath], dict[gidopen.AbsolutePath, str]]
+        self.settings.set(gidopen.SETTING_PWD, setting)
+        gc = gidopen.gidopen_in_view(self.view)
+        return gc._setup_folders()
 
     def test_setting_absolute_ok(self):
         tmpdir = tempfile.gettempdir()
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            pwd, _folders, _labels = gc._setup_folders()
-            self.assertEqual(str(pwd), tmpdir)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+        pwd, _folders, _labels = self._setup_folders(tmpdir)
+        self.assertEqual(str(pwd), tmpdir)
 
     def test_setting_tilde_ok(self):
         with tempfile.TemporaryDirectory(dir=os.path.expanduser('~')) as tmpdir:
-            view = sublime.active_window().new_file()
-            try:
-                settings = view.settings()
-                settings.set(gidopen.SETTING_PWD, os.path.join('~', os.path.basename(tmpdir)))
-                gc = gidopen.gidopen_in_view(view)
-                pwd, _folders, _labels = gc._setup_folders()
-                self.assertEqual(str(pwd), tmpdir)
-            finally:
-                view.set_scratch(True)
-                view.window().focus_view(view)
-                view.window().run_command("close_file")
+            setting = os.path.join('~', os.path.basename(tmpdir))
+            pwd, _folders, _labels = self._setup_folders(setting)
+            self.assertEqual(str(pwd), tmpdir)
 
     def test_setting_file_fails(self):
         with tempfile.NamedTemporaryFile() as tmpfile:
-            view = sublime.active_window().new_file()
-            try:
-                settings = view.settings()
-                settings.set(gidopen.SETTING_PWD, tmpfile.name)
-                gc = gidopen.gidopen_in_view(view)
-                pwd, folders, _labels = gc._setup_folders()
-                # setting fails, so fallback to folders[0]
-                self.assertEqual(pwd, folders[0])
-            finally:
-                view.set_scratch(True)
-                view.window().focus_view(view)
-                view.window().run_command("close_file")
+            pwd, folders, _labels = self._setup_folders(tmpfile.name)
+            # setting fails, so fallback to folders[0]
+            self.assertEqual(pwd, folders[0])
 
     def test_setting_relative_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            view = sublime.active_window().new_file()
-            try:
-                settings = view.settings()
-                settings.set(gidopen.SETTING_PWD, os.path.basename(tmpdir))
-                gc = gidopen.gidopen_in_view(view)
-                pwd, folders, _labels = gc._setup_folders()
-                # setting fails, so fallback to folders[0]
-                self.assertEqual(pwd, folders[0])
-            finally:
-                view.set_scratch(True)
-                view.window().focus_view(view)
-                view.window().run_command("close_file")
-
-    def test_setting_notexist_fails(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, '/nonexisting/folder')
-            gc = gidopen.gidopen_in_view(view)
-            pwd, folders, _labels = gc._setup_folders()
+            pwd, folders, _labels = self._setup_folders(os.path.basename(tmpdir))
             # setting fails, so fallback to folders[0]
             self.assertEqual(pwd, folders[0])
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+
+    def test_setting_notexist_fails(self):
+        pwd, folders, _labels = self._setup_folders('/nonexisting/folder')
+        # setting fails, so fallback to folders[0]
+        self.assertEqual(pwd, folders[0])
 
 class TestGidOpenPoint(TestCase):
 
-    def setUp(self):
-        self.tmpdir = tempfile.mkdtemp()
-        self.file_absent = os.path.join(self.tmpdir, 'absent')
-        self.file_present = os.path.join(self.tmpdir, 'present')
-        with open(self.file_present, 'w'):
-            pass
-        self.also_present = os.path.join(self.tmpdir, 'also present')
-        with open(self.also_present, 'w'):
-            pass
-        self.tilde_file = os.path.join(self.tmpdir, '~4.txt')
-        with open(self.tilde_file, 'w'):
-            pass
-        self.atypical_file = os.path.join(self.tmpdir, 'file & ice.txt')
-        with open(self.atypical_file, 'w'):
-            pass
+    @classmethod
+    def setUpClass(cls):
+        add_fixtures(cls)
+        cls.no_candidates = cls.samples_no_candidates()
+        cls.open_candidates = cls.samples_open_candidates()
 
-        home = os.path.expanduser('~')
-        tilde_file = None
-        for basename in os.listdir(home):
-            if len(basename) > 2:
-                path = os.path.join(home, basename)
-                if os.path.isfile(path):
-                    tilde_file = path
-                    break
-        self.assertIsNotNone(tilde_file)
-        self.home_base = basename
-        self.home_present = tilde_file
+        # Creating a view is slow, so all tests share one view and command
+        cls.view = sublime.active_window().new_file()
+        cls.settings = cls.view.settings()
+        cls.gc = gidopen.gidopen_in_view(cls.view)
 
-        # make sure we have a window to work with
-        s = sublime.load_settings("Preferences.sublime-settings")
-        s.set("close_windows_when_empty", False)
+    @classmethod
+    def tearDownClass(cls):
+        close_view(cls.view)
 
-    def tearDown(self):
-        shutil.rmtree(self.tmpdir)
-
-    def samples_no_candidates(self):
+    def setUp(self):
+        self.assertIsNotNone(HOME_PRESENT)
+        self.home_base = HOME_BASE
+        self.home_present = HOME_PRESENT
+
+    def _reset_view(self, text):
+        # type: (str) -> int
+        # Replace the text in the shared view and return its size
+        view = self.view
+        view.run_command('select_all')
+        view.run_command('right_delete')
+        self.settings.set(gidopen.SETTING_PWD, self.tmpdir)
+        view.run_command('append', {'characters': text, 'force': True})
+        return len(text)
+
+    @classmethod
+    def samples_no_candidates(cls):
         return (
             '   \n',              # no path characters
-            self.file_absent,     # directory exists, but file does not
+            cls.file_absent,     # directory exists, but file does not
             '/tmp/noexist/file',  # directory does not exist
             'absent',             # relative file does not exist
             # Even though `present` does exist, the fact that even one
@@ -199,846 +300,421 @@ class TestGidOpenPoint(TestCase):
         )
 
     def test_no_candidates(self):
-        for text in self.samples_no_candidates():
-            view = sublime.active_window().new_file()
-            try:
-                settings = view.settings()
-                settings.set(gidopen.SETTING_PWD, self.tmpdir)
-                gc = gidopen.gidopen_in_view(view)
-
-                view.run_command('append', {'characters': text, 'force': True})
-                for pos in range(view.size() + 1):
-                    x, y = view.text_to_window(pos)
-                    event = {'x': x, 'y': y}
-                    gc.description(event)
-                    action, path = view.settings().get('gidopen_in_view')
-                    self.assertFalse(gc.is_visible(event), (text, pos))
-                    self.assertEqual(action, None, (text, pos))
-                    self.assertEqual(path, None, (text, pos))
-            finally:
-                view.set_scratch(True)
-                view.window().focus_view(view)
-                view.window().run_command("close_file")
-
-    def samples_open_candidates(self):
-        dirname = os.path.dirname(self.file_present)
+        gc = self.gc
+        for text in self.no_candidates:
+            self._reset_view(text)
+            for pos in interesting_positions(text):
+                action, path = gc._describe(pos)[1:]
+                self.assertEqual((action, path), (None, None), (text, pos))
+
+    @classmethod
+    def samples_open_candidates(cls):
+        dirname = os.path.dirname(cls.file_present)
         parent = os.path.basename(dirname)
-        present = os.path.basename(self.file_present)
+        present = os.path.basename(cls.file_present)
         return (
-            (self.file_present, self.file_present),  # absolute path
-            (present, self.file_present),  # basename only relative
-            ('./' + present, self.file_present),  # dot-slash relative
-            (parent + '/' + present, self.file_present),
-            ('./' + parent + '/' + present, self.file_present),
-            (parent + '/./' + present, self.file_present),
-            (dirname + '/./' + present, self.file_present),
+            (cls.file_present, cls.file_present),  # absolute path
+            (present, cls.file_present),  # basename only relative
+            ('./' + present, cls.file_present),  # dot-slash relative
+            (parent + '/' + present, cls.file_present),
+            ('./' + parent + '/' + present, cls.file_present),
+            (parent + '/./' + present, cls.file_present),
+            (dirname + '/./' + present, cls.file_present),
             # Can match an absolute path with different hierarchy as long as
             # basename and first parent match.  This is common:
             # - when tasks run inside containers
             # - in Go code where URL's represent the code hierarchy
-            ('/notexist/' + parent + '/' + present, self.file_present),
+            ('/notexist/' + parent + '/' + present, cls.file_present),
             # A filename that starts with ~ but is not pointing to a home
             # directory can be matched
-            (self.tilde_file, self.tilde_file),
-            (os.path.basename(self.tilde_file), self.tilde_file),
+            (cls.tilde_file, cls.tilde_file),
+            (os.path.basename(cls.tilde_file), cls.tilde_file),
             # Files with spaces can be matched. This also demonstrates that
             # the longer match wins (`also present` beats `present`)
-            (self.also_present, self.also_present),
-            (os.path.basename(self.also_present), self.also_present),
+            (cls.also_present, cls.also_present),
+            (os.path.basename(cls.also_present), cls.also_present),
             # Files with up to three atypical characters in sequence surrounded
             # by typical characters can be matched.
-            (self.atypical_file, self.atypical_file),
-            (os.path.basename(self.atypical_file), self.atypical_file),
+            (cls.atypical_file, cls.atypical_file),
+            (os.path.basename(cls.atypical_file), cls.atypical_file),
         )
 
     def test_open_candidates(self):
-        for text, filename in self.samples_open_candidates():
-            view = sublime.active_window().new_file()
-            try:
-                settings = view.settings()
-                settings.set(gidopen.SETTING_PWD, self.tmpdir)
-                gc = gidopen.gidopen_in_view(view)
-
-                view.run_command('append', {'characters': text, 'force': True})
-                if text[1] == ':':
-                    # Windows path with drive
-                    start = 2
-                else:
-                    start = 0
-                for pos in range(start, view.size() + 1):
-                    x, y = view.text_to_window(pos)
-                    event = {'x': x, 'y': y}
-                    message = gc.description(event)
-                    action, path = view.settings().get('gidopen_in_view')
-                    self.assertTrue(gc.is_visible(event), (text, pos))
-                    self.assertEqual(
-                        message, '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(filename)), (text, pos)
-                    )
-                    self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN, (text, pos))
-                    self.assertEqual(path, filename, (text, pos))
-            finally:
-                view.set_scratch(True)
-                view.window().focus_view(view)
-                view.window().run_command("close_file")
-
-    def test_tilde_home_existing(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            home_base = os.path.basename(self.home_present)
+        gc = self.gc
+        for text, filename in self.open_candidates:
+            self._reset_view(text)
+            expected = '{} {}'.format(OPEN, shorten_name(filename))
+            if text[1] == ':':
+                # Windows path with drive
+                start = 2
+            else:
+                start = 0
+            for pos in interesting_positions(text, start):
+                message, action, path = gc._describe(pos)
+                self.assertEqual(
+                    (message, action, path),
+                    (expected, OPEN, filename),
+                    (text, pos)
+                )
 
-            view.run_command(
-                'append', {'characters': '~/' + home_base, 'force': True}
+    def test_home_existing(self):
+        if IS_WINDOWS:
+            homes = (
+                '~', '$HOMEDRIVE$HOMEPATH', '${HOMEDRIVE}${HOMEPATH}',
+                '%HOMEDRIVE%%HOMEPATH%',
             )
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), '~/' + home_base)
-            self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.home_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-    def test_unbraced_env_existing(self):
-        if platform.system() == 'Windows':
-            home = '$HOMEDRIVE$HOMEPATH'
         else:
-            home = '$HOME'
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            home_base = os.path.basename(self.home_present)
-
-            view.run_command(
-                'append', {'characters': home + '/' + home_base, 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
+            homes = ('~', '$HOME', '${HOME}')
+        gc = self.gc
+        expected = '{} {}'.format(OPEN, shorten_name(self.home_present))
+
+        for home in homes:
+            text = home + '/' + self.home_base
+            size = self._reset_view(text)
+            message, action, path = gc._describe(size - 2)
             self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
+                (message, action, path),
+                (expected, OPEN, self.home_present),
+                text
             )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.home_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-    def test_braced_env_existing(self):
-        if platform.system() == 'Windows':
-            home = '${HOMEDRIVE}${HOMEPATH}'
-        else:
-            home = '${HOME}'
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            home_base = os.path.basename(self.home_present)
-
-            view.run_command(
-                'append', {'characters': home + '/' + home_base, 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.home_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-    @skipIf(platform.system() != 'Windows', 'Windows-specific test')
-    def test_windows_env_existing(self):
-        home = '%HOMEDRIVE%%HOMEPATH%'
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            home_base = os.path.basename(self.home_present)
-
-            view.run_command(
-                'append', {'characters': home + '/' + home_base, 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.home_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
 
     def test_absolute_path_with_row(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
+        gc = self.gc
 
-            view.run_command(
-                'append', {'characters': self.file_present + ':12', 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 5)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}:12'.format(
-                    gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-                )
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-            self.assertEqual(path, self.file_present + ':12:0')
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+        size = self._reset_view(self.file_present + ':12')
+        message, action, path = gc._describe(size - 5)
+        expected_message = '{} {}:12'.format(GOTO, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, GOTO, self.path_row)
+        )
 
     def test_relative_path_with_row(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
+        gc = self.gc
 
-            view.run_command(
-                'append', {'characters': 'present:12', 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 5)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}:12'.format(
-                    gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-                )
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-            self.assertEqual(path, self.file_present + ':12:0')
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+        size = self._reset_view('present:12')
+        message, action, path = gc._describe(size - 5)
+        expected_message = '{} {}:12'.format(GOTO, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, GOTO, self.path_row)
+        )
 
     def test_absolute_path_with_row_column(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-
-            view.run_command(
-                'append', {
-                    'characters': self.file_present + ':12:34', 'force': True
-                }
-            )
-            x, y = view.text_to_window(view.size() - 8)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}:12:34'.format(
-                    gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-                )
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-            self.assertEqual(path, self.file_present + ':12:34')
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+        gc = self.gc
+
+        size = self._reset_view(self.file_present + ':12:34')
+        message, action, path = gc._describe(size - 8)
+        expected_message = '{} {}:12:34'.format(GOTO, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, GOTO, self.path_row_col)
+        )
 
     def test_relative_path_with_row_column(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
+        gc = self.gc
 
-            view.run_command(
-                'append', {'characters': 'present:12:34', 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 8)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}:12:34'.format(
-                    gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-                )
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-            self.assertEqual(path, self.file_present + ':12:34')
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
+        size = self._reset_view('present:12:34')
+        message, action, path = gc._describe(size - 8)
+        expected_message = '{} {}:12:34'.format(GOTO, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, GOTO, self.path_row_col)
+        )
 
     def test_file_from_set_environment_variable(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-
-            view.run_command(
-                'append', {
-                    'characters': 'ENVNAME={}\n'.format(self.file_present),
-                    'force': True
-                }
-            )
-            x, y = view.text_to_window(view.size() - 4)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.file_present))
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.file_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-    def test_file_at_end_of_sentence(self):
-        view = sublime.active_window().new_file()
-        try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-
-            # Extra dot does not confuse matcher
-            sentence = 'Open the file {}.'.format(self.file_present)
-            view.run_command(
-                'append', {'characters': sentence, 'force': True}
-            )
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
-            message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
-            self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.file_present))
-            )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.file_present)
-        finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-
-class TestGidOpenRegion(TestCase):
-
-    def setUp(self):
-        self.tmpdir = tempfile.mkdtemp()
-        self.file_absent = os.path.join(self.tmpdir, 'absent')
-        self.file_present = os.path.join(self.tmpdir, 'present')
-        with open(self.file_present, 'w'):
-            pass
-        self.also_present = os.path.join(self.tmpdir, 'also present')
-        with open(self.also_present, 'w'):
-            pass
-        home = os.path.expanduser('~')
-        tilde_file = None
-        for basename in os.listdir(home):
-            if len(basename) > 2:
-                path = os.path.join(home, basename)
-                if os.path.isfile(path):
-                    tilde_file = path
-                    break
-        self.assertIsNotNone(tilde_file)
-        self.home_base = basename
-        self.home_present = tilde_file
-
-        self.view = sublime.active_window().new_file()
-        settings = self.view.settings()
-        settings.set(gidopen.SETTING_PWD, self.tmpdir)
-        # make sure we have a window to work with
-        s = sublime.load_settings("Preferences.sublime-settings")
-        s.set("close_windows_when_empty", False)
+        gc = self.gc
 
-    def tearDown(self):
-        if self.view:
-            self.view.set_scratch(True)
-            self.view.window().focus_view(self.view)
-            self.view.window().run_command("close_file")
-        shutil.rmtree(self.tmpdir)
-
-    def test_empty_area_hides_menu(self):
-        gc = gidopen.gidopen_in_view(self.view)
-
-        self.view.run_command('append', {'characters': '   \n', 'force': True})
-        self.view.sel().add(sublime.Region(0, self.view.size()))
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertEqual(action, None)
-        self.assertEqual(path, None)
-        self.assertFalse(gc.is_visible(event), (action, path))
-
-    def test_absolute_path_nonexisting_file(self):
-        gc = gidopen.gidopen_in_view(self.view)
-
-        self.view.run_command(
-            'append', {'characters': self.file_absent, 'force': True}
+        size = self._reset_view('ENVNAME={}\n'.format(self.file_present))
+        message, action, path = gc._describe(size - 4)
+        expected_message = '{} {}'.format(OPEN, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, OPEN, self.file_present)
         )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_NEW)
-        self.assertEqual(path, self.file_absent)
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(message, '{} {}'.format(action, shorten_name(path)))
 
-    def test_absolute_path_nonexisting_directory(self):
-        gc = gidopen.gidopen_in_view(self.view)
-
-        tmpdir = tempfile.gettempdir()
-        foldername = os.path.join(tmpdir, 'noexist')
-        filename = os.path.join(foldername, 'file')
+    def test_file_at_end_of_sentence(self):
+        gc = self.gc
 
-        self.view.run_command(
-            'append', {'characters': filename, 'force': True}
+        # Extra dot does not confuse matcher
+        sentence = 'Open the file {}.'.format(self.file_present)
+        size = self._reset_view(sentence)
+        message, action, path = gc._describe(size - 2)
+        expected_message = '{} {}'.format(OPEN, shorten_name(self.file_present))
+        self.assertEqual(
+            (message, action, path),
+            (expected_message, OPEN, self.file_present)
         )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
-        x, y = self.view.text_to_window(self.view.size() - 8)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FOLDER_NEW)
-        self.assertEqual(path, foldername)
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(message, '{} {}'.format(action, shorten_name(path)))
 
-    def test_relative_path_nonexisting(self):
-        gc = gidopen.gidopen_in_view(self.view)
 
-        self.view.run_command(
-            'append', {'characters': 'absent', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertFalse(gc.is_visible(event), (action, path))
-        self.assertEqual(action, None)
-        self.assertEqual(path, None)
+class ViewTestCase(TestCase):
 
-    def test_absolute_path_existing(self):
-        gc = gidopen.gidopen_in_view(self.view)
+    def _clear_view(self):
+        self.view.run_command('select_all')
+        self.view.run_command('right_delete')
 
-        self.view.run_command(
-            'append', {'characters': self.file_present, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def _prime(self, characters, click_back=2, sel_end=None):
+        # Replace the text in `self.view` with `characters` and select them,
+        # or the first `sel_end` characters. Return the event for a click
+        # `click_back` characters before the end of the text.
+        self._clear_view()
+        view = self.view
+        view.run_command('append', {'characters': characters, 'force': True})
+        size = len(characters)
+        if sel_end is None:
+            sel_end = size
+        selection = view.sel()
+        selection.clear()
+        if sel_end:
+            # An empty selection is ignored by the command, so skip it
+            selection.add(sublime.Region(0, sel_end))
+        x, y = view.text_to_window(size - click_back)
+        return {'x': x, 'y': y}
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.file_present)
-        self.assertEqual(message, '{} {}'.format(action, shorten_name(path)))
 
-    def test_relative_path_existing(self):
-        gc = gidopen.gidopen_in_view(self.view)
+class TestGidOpenRegion(ViewTestCase):
 
-        self.view.run_command(
-            'append', {'characters': 'present', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    @classmethod
+    def setUpClass(cls):
+        add_fixtures(cls)
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.file_present))
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.file_present)
+        # Creating a view is slow, so all tests share one view and command
+        cls.view = sublime.active_window().new_file()
+        cls.settings = cls.view.settings()
+        cls.gc = gidopen.gidopen_in_view(cls.view)
 
-    def test_dot_slash_path_existing(self):
-        gc = gidopen.gidopen_in_view(self.view)
+    @classmethod
+    def tearDownClass(cls):
+        close_view(cls.view)
 
-        self.view.run_command(
-            'append', {'characters': './present', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def setUp(self):
+        self.assertIsNotNone(HOME_PRESENT)
+        self.home_base = HOME_BASE
+        self.home_present = HOME_PRESENT
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.file_present))
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.file_present)
+        self.settings.set(gidopen.SETTING_PWD, self.tmpdir)
+        self.settings.erase('gidopen_in_view')
 
-    def test_tilde_path_existing(self):
-        tilde_file = os.path.join(self.tmpdir, '~4.txt')
-        with open(tilde_file, 'w'):
-            pass
+    def test_empty_area_hides_menu(self):
+        gc = self.gc
 
-        gc = gidopen.gidopen_in_view(self.view)
+        event = self._prime('   \n')
+        gc.description(event)
+        action, path = self.settings.get('gidopen_in_view')
+        self.assertEqual((gc.is_visible(event), action, path), (False, None, None))
 
-        self.view.run_command(
-            'append', {'characters': '~4.txt', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def test_absolute_path_nonexisting_file(self):
+        gc = self.gc
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
+        event = self._prime(self.file_absent)
         message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
+        action, path = self.settings.get('gidopen_in_view')
+        expected_message = '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_NEW, shorten_name(self.file_absent))
         self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(tilde_file))
+            (gc.is_visible(event), message, action, path),
+            (True, expected_message, gidopen.CONTEXT_ACTION_FILE_NEW, self.file_absent)
         )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, tilde_file)
 
-    def test_tilde_home_existing(self):
-        gc = gidopen.gidopen_in_view(self.view)
-        home_base = os.path.basename(self.home_present)
+    def test_absolute_path_nonexisting_directory(self):
+        gc = self.gc
 
-        self.view.run_command(
-            'append', {'characters': '~' + os.sep + home_base, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+        tmpdir = tempfile.gettempdir()
+        foldername = os.path.join(tmpdir, 'noexist')
+        filename = os.path.join(foldername, 'file')
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
+        event = self._prime(filename, click_back=8)
         message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
+        action, path = self.settings.get('gidopen_in_view')
+        expected_message = '{} {}'.format(gidopen.CONTEXT_ACTION_FOLDER_NEW, shorten_name(foldername))
         self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
+            (gc.is_visible(event), message, action, path),
+            (True, expected_message, gidopen.CONTEXT_ACTION_FOLDER_NEW, foldername)
         )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.home_present)
 
-    def test_unbraced_env_existing(self):
-        if platform.system() == 'Windows':
-            home = '$HOMEDRIVE$HOMEPATH'
-        else:
-            home = '$HOME'
+    def test_relative_path_nonexisting(self):
+        gc = self.gc
 
-        gc = gidopen.gidopen_in_view(self.view)
-        home_base = os.path.basename(self.home_present)
+        event = self._prime('absent')
+        gc.description(event)
+        action, path = self.settings.get('gidopen_in_view')
+        self.assertEqual((gc.is_visible(event), action, path), (False, None, None))
 
-        self.view.run_command(
-            'append', {'characters': home + os.sep + home_base, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def test_visibility_follows_text_at_same_point(self):
+        gc = self.gc
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.home_present)
+        event = self._prime('present')
+        gc.description(event)
+        self.assertTrue(gc.is_visible(event))
 
-    def test_braced_env_existing(self):
-        if platform.system() == 'Windows':
-            home = '${HOMEDRIVE}${HOMEPATH}'
-        else:
-            home = '${HOME}'
+        # Change only text after the click, so the click has the same
+        # coordinates in any font
+        self.assertEqual(self._prime('presexx'), event)
+        gc.description(event)
+        self.assertFalse(gc.is_visible(event))
 
-        gc = gidopen.gidopen_in_view(self.view)
-        home_base = os.path.basename(self.home_present)
+    def test_run_resets_visibility(self):
+        gc = self.gc
+        window = self.view.window()
 
-        self.view.run_command(
-            'append', {'characters': home + os.sep + home_base, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+        event = self._prime(self.file_present)
+        gc.description(event)
+        self.assertTrue(gc.is_visible(event))
+        gc.run(None, event)
+        try:
+            self.assertIsNone(self.settings.get('gidopen_in_view'))
+            self.assertFalse(gc.is_visible(event))
+        finally:
+            opened = window.find_open_file(self.file_present)
+            if opened is not None:
+                close_view(opened)
+            window.focus_view(self.view)
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.home_present)
+    def test_file_created_after_listing(self):
+        gc = self.gc
+        tmpdir = make_fixtures(())[0]
+        fresh = os.path.join(tmpdir, 'fresh')
 
-    @skipIf(platform.system() != 'Windows', 'Windows-specific test')
-    def test_windows_env_existing(self):
-        home = '%HOMEDRIVE%%HOMEPATH%'
-        view = sublime.active_window().new_file()
         try:
-            settings = view.settings()
-            settings.set(gidopen.SETTING_PWD, self.tmpdir)
-            gc = gidopen.gidopen_in_view(view)
-            home_base = os.path.basename(self.home_present)
-
-            view.run_command(
-                'append', {'characters': home + '/' + home_base, 'force': True}
-            )
-            self.view.sel().add(sublime.Region(0, self.view.size()))
+            # The first click lists the directory before the file exists
+            event = self._prime(fresh)
+            gc.description(event)
+            action, path = self.settings.get('gidopen_in_view')
+            self.assertEqual((action, path), (gidopen.CONTEXT_ACTION_FILE_NEW, fresh))
 
-            x, y = view.text_to_window(view.size() - 2)
-            event = {'x': x, 'y': y}
+            touch(fresh)
             message = gc.description(event)
-            action, path = view.settings().get('gidopen_in_view')
-            self.assertTrue(gc.is_visible(event), (action, path))
+            action, path = self.settings.get('gidopen_in_view')
+            expected_message = '{} {}'.format(OPEN, shorten_name(fresh))
             self.assertEqual(
-                message,
-                '{} {}'.format(gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.home_present))
+                (gc.is_visible(event), message, action, path),
+                (True, expected_message, OPEN, fresh)
             )
-            self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-            self.assertEqual(path, self.home_present)
         finally:
-            view.set_scratch(True)
-            view.window().focus_view(view)
-            view.window().run_command("close_file")
-
-    def test_click_after_space(self):
-        gc = gidopen.gidopen_in_view(self.view)
+            remove_fixtures(tmpdir)
 
-        self.view.run_command(
-            'append', {'characters': self.also_present, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def test_existing_paths(self):
+        gc = self.gc
+        cases = (self.file_present, 'present', './present')
+        expected = '{} {}'.format(OPEN, shorten_name(self.file_present))
 
-        x, y = self.view.text_to_window(self.view.size() - 2)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}'.format(
-                gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.also_present)
+        for text in cases:
+            event = self._prime(text)
+            message = gc.description(event)
+            action, path = self.settings.get('gidopen_in_view')
+            self.assertEqual(
+                (gc.is_visible(event), message, action, path),
+                (True, expected, OPEN, self.file_present),
+                text
             )
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.also_present)
-
-    def test_click_before_space(self):
-        gc = gidopen.gidopen_in_view(self.view)
 
-        self.view.run_command(
-            'append', {'characters': self.also_present, 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, self.view.size()))
+    def test_tilde_path_existing(self):
+        gc = self.gc
 
-        x, y = self.view.text_to_window(self.view.size() - 12)
-        event = {'x': x, 'y': y}
+        event = self._prime('~4.txt')
         message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
+        action, path = self.settings.get('gidopen_in_view')
+        expected_message = '{} {}'.format(OPEN, shorten_name(self.tilde_file))
         self.assertEqual(
-            message,
-            '{} {}'.format(
-                gidopen.CONTEXT_ACTION_FILE_OPEN, shorten_name(self.also_present)
-            )
+            (gc.is_visible(event), message, action, path),
+            (True, expected_message, OPEN, self.tilde_file)
         )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_OPEN)
-        self.assertEqual(path, self.also_present)
-
-    def test_absolute_path_with_row(self):
-        gc = gidopen.gidopen_in_view(self.view)
 
-        self.view.run_command(
-            'append', {'characters': self.file_present + ':12', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, len(self.file_present)))
-
-        x, y = self.view.text_to_window(self.view.size() - 5)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}:12'.format(
-                gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
+    def test_home_existing(self):
+        if IS_WINDOWS:
+            prefixes = (
+                '~' + os.sep,
+                '$HOMEDRIVE$HOMEPATH' + os.sep,
+                '${HOMEDRIVE}${HOMEPATH}' + os.sep,
+                '%HOMEDRIVE%%HOMEPATH%/',
             )
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-        self.assertEqual(path, self.file_present + ':12:0')
-
-    def test_relative_path_with_row(self):
-        gc = gidopen.gidopen_in_view(self.view)
+        else:
+            prefixes = ('~' + os.sep, '$HOME' + os.sep, '${HOME}' + os.sep)
+        gc = self.gc
+        home_base = self.home_base
+        expected = '{} {}'.format(OPEN, shorten_name(self.home_present))
 
-        self.view.run_command(
-            'append', {'characters': 'present:12', 'force': True}
+        for prefix in prefixes:
+            event = self._prime(prefix + home_base)
+            message = gc.description(event)
+            action, path = self.settings.get('gidopen_in_view')
+            self.assertEqual(
+                (gc.is_visible(event), message, action, path),
+                (True, expected, OPEN, self.home_present),
+                prefix
+            )
+
+    def test_path_parsing(self):
+        gc = self.gc
+        present = self.file_present
+        also = self.also_present
+        row = self.path_row
+        row_col = self.path_row_col
+        # (characters, click_back, sel_end, action, path)
+        cases = (
+            # Clicks either side of the space select the whole filename
+            (also, 2, None, OPEN, also),
+            (also, 12, None, OPEN, also),
+            (present + ':12', 5, len(present), GOTO, row),
+            ('present:12', 5, len('present'), GOTO, row),
+            (present + ':12:34', 8, len(present), GOTO, row_col),
+            ('present:12:34', 8, len('present'), GOTO, row_col),
+            # An explicit zero column stays in the label
+            ('present:12:0', 7, len('present'), GOTO, row),
         )
-        self.view.sel().add(sublime.Region(0, len('present')))
 
-        x, y = self.view.text_to_window(self.view.size() - 5)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}:12'.format(
-                gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
+        for characters, click_back, sel_end, action_expected, expected_path in cases:
+            event = self._prime(characters, click_back=click_back, sel_end=sel_end)
+            message = gc.description(event)
+            action, path = self.settings.get('gidopen_in_view')
+            if action_expected == GOTO:
+                # The label shows the line and column as written after the
+                # selected filename, so the case must select only the filename
+                self.assertIsNotNone(sel_end, characters)
+                filename = expected_path.rsplit(':', 2)[0]
+                label = shorten_name(filename) + characters[sel_end:]
+            else:
+                label = shorten_name(expected_path)
+            self.assertEqual(
+                (gc.is_visible(event), message, action, path),
+                (True, '{} {}'.format(action_expected, label), action_expected, expected_path),
+                characters
             )
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-        self.assertEqual(path, self.file_present + ':12:0')
 
-    def test_absolute_path_with_row_column(self):
-        gc = gidopen.gidopen_in_view(self.view)
 
-        self.view.run_command(
-            'append', {
-                'characters': self.file_present + ':12:34', 'force': True
-            }
-        )
-        self.view.sel().add(sublime.Region(0, len(self.file_present)))
-        x, y = self.view.text_to_window(self.view.size() - 8)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}:12:34'.format(
-                gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-            )
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-        self.assertEqual(path, self.file_present + ':12:34')
+@skipIf(IS_WINDOWS, 'Cannot set non-readable file on Windows')
+class TestPermissions(ViewTestCase):
 
-    def test_relative_path_with_row_column(self):
-        gc = gidopen.gidopen_in_view(self.view)
+    @classmethod
+    def setUpClass(cls):
+        fd, cls.unreadable = tempfile.mkstemp(dir=TMP_ROOT)
+        os.close(fd)
+        os.chmod(cls.unreadable, 0o000)
+        cls.view = sublime.active_window().new_file()
+        cls.settings = cls.view.settings()
+        cls.gc = gidopen.gidopen_in_view(cls.view)
 
-        self.view.run_command(
-            'append', {'characters': 'present:12:34', 'force': True}
-        )
-        self.view.sel().add(sublime.Region(0, len('present')))
-
-        x, y = self.view.text_to_window(self.view.size() - 8)
-        event = {'x': x, 'y': y}
-        message = gc.description(event)
-        action, path = self.view.settings().get('gidopen_in_view')
-        self.assertTrue(gc.is_visible(event), (action, path))
-        self.assertEqual(
-            message,
-            '{} {}:12:34'.format(
-                gidopen.CONTEXT_ACTION_FILE_GOTO, shorten_name(self.file_present)
-            )
-        )
-        self.assertEqual(action, gidopen.CONTEXT_ACTION_FILE_GOTO)
-        self.assertEqual(path, self.file_present + ':12:34')
-
-
-@skipIf(platform.system() == 'Windows', 'Cannot set non-readable file on Windows')
-class TestPermissions(TestCase):
-
-    def setUp(self):
-        self.view = sublime.active_window().new_file()
-        # make sure we have a window to work with
-        s = sublime.load_settings("Preferences.sublime-settings")
-        s.set("close_windows_when_empty", False)
+    @classmethod
+    def tearDownClass(cls):
+        close_view(cls.view)
+        os.unlink(cls.unreadable)
 
     def tearDown(self):
-        if self.view:
-            self.view.set_scratch(True)
-            self.view.window().focus_view(self.view)
-            self.view.window().run_command("close_file")
+        self.settings.erase('gidopen_in_view')
 
     def test_file_not_readable_point(self):
-        with tempfile.NamedTemporaryFile() as f:
-            os.chmod(f.name, 0o000)
-            assert not gidopen.is_readable(f.name)
-            gc = gidopen.gidopen_in_view(self.view)
-
-            self.view.run_command(
-                'append', {'characters': f.name, 'force': True}
-            )
+        assert not gidopen.is_readable(self.unreadable)
+        gc = self.gc
 
-            x, y = self.view.text_to_window(self.view.size() - 8)
-            event = {'x': x, 'y': y}
-            gc.description(event)
-            action, path = self.view.settings().get('gidopen_in_view')
-            self.assertFalse(gc.is_visible(event), (action, path))
-            self.assertEqual(action, None)
-            self.assertEqual(path, None)
+        event = self._prime(self.unreadable, click_back=8, sel_end=0)
+        gc._resolve(self.view.window_to_text((event['x'], event['y'])))
+        action, path = self.settings.get('gidopen_in_view')
+        self.assertEqual((gc.is_visible(event), action, path), (False, None, None))
 
     def test_file_not_readable_region(self):
-        with tempfile.NamedTemporaryFile() as f:
-            os.chmod(f.name, 0o000)
-            assert not gidopen.is_readable(f.name)
-            gc = gidopen.gidopen_in_view(self.view)
-
-            self.view.run_command(
-                'append', {'characters': f.name, 'force': True}
-            )
-            self.view.sel().add(sublime.Region(0, len(f.name)))
+        assert not gidopen.is_readable(self.unreadable)
+        gc = self.gc
 
-            x, y = self.view.text_to_window(self.view.size() - 8)
-            event = {'x': x, 'y': y}
-            gc.description(event)
-            action, path = self.view.settings().get('gidopen_in_view')
-            self.assertFalse(gc.is_visible(event), (action, path))
-            self.assertEqual(action, None)
-            self.assertEqual(path, None)
+        event = self._prime(self.unreadable, click_back=8, sel_end=len(self.unreadable))
+        gc._resolve(self.view.window_to_text((event['x'], event['y'])))
+        action, path = self.settings.get('gidopen_in_view')
+        self.assertEqual((gc.is_visible(event), action, path), (False, None, None))